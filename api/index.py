@@ -4,44 +4,441 @@ Exposes MCP server functionality via HTTP endpoints
 """
 
 from http.server import BaseHTTPRequestHandler
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
 import os
-from openai import OpenAI
+import re
+import ssl
+import threading
+import httpx
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+# Build the SSL context once; creating it loads the CA bundle from disk
+_SSL_CTX = ssl.create_default_context()
+
+# Shared connection pool so repeated calls reuse keep-alive sockets
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+_HTTP = httpx.Client(verify=_SSL_CTX, limits=_LIMITS, timeout=httpx.Timeout(30.0, connect=10.0))
+
+# OpenAI client, created on first use so GET/OPTIONS never import the SDK
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client():
+    """Return the shared OpenAI client, importing and constructing it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                from openai import OpenAI
+                _CLIENT = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=_HTTP)
+    return _CLIENT
+
+# Exact-match LRU cache of completions, keyed by (model, messages, max_tokens)
+_CACHE = OrderedDict()
+_CACHE_MAX = 1024
+_CACHE_LOCK = threading.Lock()
+
+
+def _key(model, messages, max_tokens, temperature=None):
+    """Build a stable cache key for a completion request, or None if it is not cacheable."""
+    if temperature and temperature > 0:
+        return None
+    payload = json.dumps({"m": model, "msgs": messages, "mt": max_tokens}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_get(k):
+    """Return the cached result for k, marking it most recently used."""
+    with _CACHE_LOCK:
+        if k in _CACHE:
+            _CACHE.move_to_end(k)
+            return _CACHE[k]
+    return None
+
+
+def _cache_put(k, result):
+    """Store a result under k, evicting the least recently used entry when full."""
+    with _CACHE_LOCK:
+        _CACHE[k] = result
+        if len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+
+
+def _complete(model, messages, max_tokens=1000, temperature=None, response_format=None, parse=None):
+    """Run a chat completion, serving deterministic requests from the cache; replies that parse rejects are not cached."""
+    k = _key(model, messages, max_tokens, temperature)
+    cached = _cache_get(k) if k is not None else None
+    if cached is not None:
+        return cached
+
+    kwargs = {} if temperature is None else {'temperature': temperature}
+    if response_format is not None:
+        kwargs['response_format'] = response_format
+    response = _get_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        **kwargs
+    )
+    result = {
+        'content': response.choices[0].message.content,
+        'finish_reason': response.choices[0].finish_reason,
+        'usage': {
+            'prompt_tokens': response.usage.prompt_tokens,
+            'completion_tokens': response.usage.completion_tokens,
+            'total_tokens': response.usage.total_tokens
+        }
+    }
+    if parse is not None:
+        result['parsed'] = parse(result)
+
+    if k is not None:
+        _cache_put(k, result)
+    return result
+
+
+# Inputs longer than this are rejected before they reach the API
+MAX_INPUT_CHARS = 200_000
+
+# Request bodies larger than this are refused without being read
+MAX_BODY = 1_048_576
+
+
+def _reject_input(value, field):
+    """Return an error response for an empty or oversized input, or None if it is usable."""
+    if not isinstance(value, str) or not value.strip():
+        return {'success': False, 'error': f'empty {field}'}
+    if len(value) > MAX_INPUT_CHARS:
+        return {'success': False, 'error': f'{field} exceeds {MAX_INPUT_CHARS} characters'}
+    return None
+
+
+# Politeness filler that adds tokens without changing the request
+_FILLER = re.compile(r'\b(could you (please )?|please |kindly |I would like to |can you )', re.I)
+
+
+def _compress(s, strip_filler=True):
+    """Collapse redundant whitespace in a prompt and, optionally, strip filler phrases."""
+    # Leading indentation is kept so pasted code, YAML and nested lists survive
+    s = re.sub(r'(?<=\S)[ \t]+(?=\S)', ' ', s)
+    if strip_filler:
+        s = _FILLER.sub('', s)
+    s = re.sub(r'[ \t]+$', '', s, flags=re.M)
+    s = re.sub(r'\n{3,}', '\n\n', s)
+    return s.rstrip().lstrip('\n')
+
+
+# Short inputs of these kinds are handled well by the smaller model
+_SHORT_INPUT_CHARS = 500
+_MINI_TYPES = {None, "summary", "sentiment"}
+
+
+def _pick_model(explicit, text, analysis_type=None):
+    """Return the caller's model, or gpt-4o-mini for short simple inputs and gpt-4o otherwise."""
+    if explicit:
+        return explicit
+    if len(text) < _SHORT_INPUT_CHARS and analysis_type in _MINI_TYPES:
+        return "gpt-4o-mini"
+    return "gpt-4o"
+
+
+def _analysis_max_tokens(text):
+    """Cap analysis output in proportion to the input length."""
+    return min(1000, max(256, len(text) // 2))
+
+
+# Fixed instructions go in a leading system message and the text in a trailing
+# user message. This only prepares for OpenAI prompt caching: these prefixes are
+# far below its 1024-token minimum, so nothing is cached by them today.
+_SYSTEM_MSGS = {
+    "sentiment": {"role": "system", "content": "Analyze the sentiment of the text the user sends and provide a detailed assessment."},
+    "themes": {"role": "system", "content": "Identify and explain the main themes in the text the user sends."},
+    "summary": {"role": "system", "content": "Provide a concise summary of the text the user sends."},
+    "key_points": {"role": "system", "content": "Extract the key points from the text the user sends as a bulleted list."}
+}
+
+
+def _analyze_messages(text, analysis_type):
+    """Build the analysis messages for text, defaulting to a summary."""
+    return [_SYSTEM_MSGS.get(analysis_type, _SYSTEM_MSGS["summary"]), {"role": "user", "content": text}]
+
+
+def _reject_items(items, field):
+    """Return an error response unless items is a non-empty list of objects whose field is usable."""
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return {'success': False, 'error': 'items must be a list of objects'}
+    if not items:
+        return {'success': False, 'error': 'empty items'}
+    for i, item in enumerate(items):
+        rejected = _reject_input(item.get(field), f'items[{i}].{field}')
+        if rejected:
+            return rejected
+    return None
+
+
+def _reject_analyze_items(items):
+    """Return an error response unless every item has usable text and a known analysis type."""
+    rejected = _reject_items(items, 'text')
+    if rejected:
+        return rejected
+    for i, item in enumerate(items):
+        analysis_type = item.get('analysis_type', 'summary')
+        if not isinstance(analysis_type, str) or analysis_type not in _SYSTEM_MSGS:
+            return {'success': False, 'error': f'unknown analysis_type in items[{i}]: {analysis_type}'}
+    return None
+
+
+def _submit_batch(requests):
+    """Upload (model, messages) pairs as a Batch API job and return its id."""
+    lines = [
+        json.dumps({
+            "custom_id": f"request-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": model, "messages": messages, "max_tokens": 1000}
+        })
+        for i, (model, messages) in enumerate(requests)
+    ]
+    batch_file = _get_client().files.create(
+        file=("batch.jsonl", "\n".join(lines).encode()),
+        purpose="batch"
+    )
+    batch = _get_client().batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+# Semantic cache for analyze requests. sentence-transformers and numpy are
+# optional; without them, or if the model cannot be loaded, near-duplicate
+# lookups are skipped and only the exact cache applies.
+_SEMANTIC_THRESHOLD = 0.92
+_SEMANTIC_MAX = 10_000
+_EMBEDDER = None
+_EMB = None
+_RESP = []
+_TAGS = []
+_SEMANTIC_LOCK = threading.Lock()
+
+
+def _load_embedder():
+    """Load the embedding model once, disabling the semantic cache if that fails."""
+    global _EMBEDDER, _EMB
+    with _SEMANTIC_LOCK:
+        if _EMBEDDER is not None:
+            return
+        try:
+            import numpy as np
+            from sentence_transformers import SentenceTransformer
+            embedder = SentenceTransformer("all-MiniLM-L6-v2")
+            _EMB = np.zeros((0, embedder.get_sentence_embedding_dimension()), dtype=np.float32)
+            _EMBEDDER = embedder
+        except Exception:
+            _EMBEDDER = False
+
+
+def _embed(analysis_type, text):
+    """Return a normalized embedding for an analyze request, or None if unavailable."""
+    if _EMBEDDER is None:
+        _load_embedder()
+    if _EMBEDDER is False:
+        return None
+    key = f"{analysis_type}:{text}"
+    try:
+        # Longer inputs are truncated by the model, so documents sharing an
+        # opening would embed identically; leave those to the exact cache
+        if len(_EMBEDDER.tokenizer.tokenize(key)) + 2 > _EMBEDDER.max_seq_length:
+            return None
+        return _EMBEDDER.encode([key], normalize_embeddings=True)
+    except Exception:
+        return None
+
+
+def _semantic_get(q, tag):
+    """Return the closest cached result produced under tag, if it is similar enough."""
+    if q is None:
+        return None
+    with _SEMANTIC_LOCK:
+        if not _EMB.size:
+            return None
+        scores = (_EMB @ q.T).ravel()
+        # Only entries from the same (analysis_type, model, max_tokens) are eligible
+        scores[[t != tag for t in _TAGS]] = -1.0
+        best = int(scores.argmax())
+        if scores[best] >= _SEMANTIC_THRESHOLD:
+            return _RESP[best]
+    return None
+
+
+def _semantic_put(q, tag, result):
+    """Store a result under embedding q and tag, evicting the oldest entry when full."""
+    global _EMB
+    if q is None:
+        return
+    import numpy as np
+    with _SEMANTIC_LOCK:
+        _EMB = np.vstack([_EMB, q])
+        _RESP.append(result)
+        _TAGS.append(tag)
+        if len(_RESP) > _SEMANTIC_MAX:
+            _EMB = _EMB[1:]
+            _RESP.pop(0)
+            _TAGS.pop(0)
+
+# Static responses are serialized once at import
+_GET_BODY = _dumps({
+    'status': 'online',
+    'service': 'MCP ChatGPT Server',
+    'endpoints': {
+        'POST /api': 'Main API endpoint',
+        'actions': ['chat', 'chat_stream', 'analyze', 'analyze_all', 'analyze_batch', 'chat_async', 'analyze_async', 'batch_result', 'list_tools']
+    }
+})
+
+_TOOLS_BODY = _dumps({
+    'success': True,
+    'tools': [
+        {
+            'name': 'chat',
+            'description': 'Chat with ChatGPT',
+            'parameters': ['message', 'system_prompt (optional)', 'model (optional: gpt-4o, gpt-4o-mini, gpt-4-turbo)']
+        },
+        {
+            'name': 'chat_stream',
+            'description': 'Chat with ChatGPT, streaming the reply as server-sent events',
+            'parameters': ['message', 'system_prompt (optional)', 'model (optional: gpt-4o, gpt-4o-mini, gpt-4-turbo)']
+        },
+        {
+            'name': 'analyze',
+            'description': 'Analyze text',
+            'parameters': ['text', 'analysis_type (sentiment|themes|summary|key_points)', 'model (optional)']
+        },
+        {
+            'name': 'analyze_all',
+            'description': 'Run several analysis types over one text in parallel',
+            'parameters': ['text', 'analysis_types (optional, defaults to all)']
+        },
+        {
+            'name': 'analyze_batch',
+            'description': 'Analyze several texts in one request',
+            'parameters': ['items (list of {text, analysis_type})']
+        },
+        {
+            'name': 'chat_async',
+            'description': 'Submit chat requests to the OpenAI Batch API',
+            'parameters': ['items (list of {message, system_prompt, model})']
+        },
+        {
+            'name': 'analyze_async',
+            'description': 'Submit text analysis requests to the OpenAI Batch API',
+            'parameters': ['items (list of {text, analysis_type})']
+        },
+        {
+            'name': 'batch_result',
+            'description': 'Fetch the status and results of a submitted batch',
+            'parameters': ['batch_id']
+        }
+    ]
+})
+
+
+def _warm_connection():
+    """Open a keep-alive connection to the OpenAI API ahead of the first request."""
+    try:
+        _HTTP.head(
+            "https://api.openai.com/v1/models",
+            headers={"Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY', '')}"}
+        )
+    except Exception:
+        pass
+
+threading.Thread(target=_warm_connection, daemon=True).start()
 
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 lets clients keep the connection open between requests
+    protocol_version = "HTTP/1.1"
+    
     def do_POST(self):
         """Handle POST requests to the API."""
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.reject_body(400)
+            return
+        if content_length > MAX_BODY:
+            self.reject_body(413)
+            return
+        post_data = self.rfile.read(max(content_length, 0))
         
         try:
-            data = json.loads(post_data.decode('utf-8'))
+            data = _loads(post_data)
             action = data.get('action')
             
-            if action == 'chat':
+            if action == 'chat_stream':
+                response = self.handle_chat_stream(data)
+                if response is None:
+                    return
+            elif action == 'chat':
                 response = self.handle_chat(data)
             elif action == 'analyze':
                 response = self.handle_analyze(data)
+            elif action == 'analyze_all':
+                response = self.handle_analyze_all(data)
+            elif action == 'analyze_batch':
+                response = self.handle_analyze_batch(data)
+            elif action == 'chat_async':
+                response = self.handle_chat_async(data)
+            elif action == 'analyze_async':
+                response = self.handle_analyze_async(data)
+            elif action == 'batch_result':
+                response = self.handle_batch_result(data)
             elif action == 'list_tools':
-                response = self.handle_list_tools()
+                response = _TOOLS_BODY
             else:
                 response = {'error': 'Unknown action'}
             
+            body = response if isinstance(response, bytes) else _dumps(response)
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Connection', 'keep-alive')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(body)
             
         except Exception as e:
+            body = _dumps({'error': str(e)})
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Connection', 'keep-alive')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode())
+            self.wfile.write(body)
+    
+    def reject_body(self, status):
+        """Refuse a request without reading its body and close the connection."""
+        # The body is left unread, so the connection cannot be reused
+        self.close_connection = True
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
     
     def do_OPTIONS(self):
         """Handle OPTIONS requests for CORS."""
@@ -49,50 +446,48 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.send_header('Connection', 'keep-alive')
         self.end_headers()
     
     def do_GET(self):
         """Handle GET requests."""
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(_GET_BODY)))
+        self.send_header('Connection', 'keep-alive')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        
-        response = {
-            'status': 'online',
-            'service': 'MCP ChatGPT Server',
-            'endpoints': {
-                'POST /api': 'Main API endpoint',
-                'actions': ['chat', 'analyze', 'list_tools']
-            }
-        }
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(_GET_BODY)
     
     def handle_chat(self, data):
         """Handle chat requests."""
         message = data.get('message', '')
         system_prompt = data.get('system_prompt', 'You are a helpful AI assistant.')
-        model = data.get('model', 'gpt-4o')
+        temperature = data.get('temperature')
+        
+        if data.get('compress', True) and isinstance(message, str):
+            message = _compress(message)
+        rejected = _reject_input(message, 'message')
+        if rejected:
+            return rejected
+        model = _pick_model(data.get('model'), message)
         
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
+            result = _complete(
+                model,
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message}
                 ],
-                max_tokens=1000
+                temperature=temperature
             )
             
             return {
                 'success': True,
-                'response': response.choices[0].message.content,
+                'response': result['content'],
                 'model': model,
-                'usage': {
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
-                }
+                'usage': result['usage']
             }
         except Exception as e:
             return {
@@ -100,35 +495,158 @@ class handler(BaseHTTPRequestHandler):
                 'error': str(e)
             }
     
+    def handle_chat_stream(self, data):
+        """Stream a chat reply as server-sent events, or return an error response if the message is rejected."""
+        message = data.get('message', '')
+        system_prompt = data.get('system_prompt', 'You are a helpful AI assistant.')
+        temperature = data.get('temperature')
+        if data.get('compress', True) and isinstance(message, str):
+            message = _compress(message)
+        rejected = _reject_input(message, 'message')
+        if rejected:
+            return rejected
+        model = _pick_model(data.get('model'), message)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": message}
+        ]
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        try:
+            k = _key(model, messages, 1000, temperature)
+            cached = _cache_get(k) if k is not None else None
+            if cached is not None:
+                self.write_event({'delta': cached['content']})
+                self.write_event({'done': True, 'model': model, 'usage': cached['usage']})
+                return
+            
+            kwargs = {} if temperature is None else {'temperature': temperature}
+            stream = _get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1000,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs
+            )
+            
+            parts = []
+            usage = None
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    self.write_event({'delta': chunk.choices[0].delta.content})
+                if chunk.usage:
+                    usage = {
+                        'prompt_tokens': chunk.usage.prompt_tokens,
+                        'completion_tokens': chunk.usage.completion_tokens,
+                        'total_tokens': chunk.usage.total_tokens
+                    }
+            
+            if k is not None and usage is not None:
+                _cache_put(k, {'content': ''.join(parts), 'usage': usage})
+            self.write_event({'done': True, 'model': model, 'usage': usage})
+        except Exception as e:
+            self.write_event({'error': str(e)})
+        finally:
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+    
+    def write_event(self, payload):
+        """Write one server-sent event as an HTTP chunk."""
+        event = b"data: " + _dumps(payload) + b"\n\n"
+        self.wfile.write(b"%X\r\n%s\r\n" % (len(event), event))
+        self.wfile.flush()
+    
     def handle_analyze(self, data):
         """Handle text analysis requests."""
         text = data.get('text', '')
         analysis_type = data.get('analysis_type', 'summary')
+        temperature = data.get('temperature')
         
-        prompts = {
-            "sentiment": f"Analyze the sentiment of this text and provide a detailed assessment:\n\n{text}",
-            "themes": f"Identify and explain the main themes in this text:\n\n{text}",
-            "summary": f"Provide a concise summary of this text:\n\n{text}",
-            "key_points": f"Extract the key points from this text as a bulleted list:\n\n{text}"
-        }
+        # Filler is part of the text being analyzed, so only whitespace is compressed
+        if data.get('compress', True) and isinstance(text, str):
+            text = _compress(text, strip_filler=False)
+        rejected = _reject_input(text, 'text')
+        if rejected:
+            return rejected
+        if not isinstance(analysis_type, str) or analysis_type not in _SYSTEM_MSGS:
+            return {'success': False, 'error': f'unknown analysis_type: {analysis_type}'}
+        model = _pick_model(data.get('model'), text, analysis_type)
+        max_tokens = _analysis_max_tokens(text)
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "user", "content": prompts.get(analysis_type, prompts['summary'])}
-                ],
-                max_tokens=1000
-            )
+            q = None if temperature else _embed(analysis_type, text)
+            result = _semantic_get(q, (analysis_type, model, max_tokens))
+            if result is None:
+                result = _complete(
+                    model,
+                    _analyze_messages(text, analysis_type),
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                _semantic_put(q, (analysis_type, model, max_tokens), result)
             
             return {
                 'success': True,
-                'analysis': response.choices[0].message.content,
+                'analysis': result['content'],
                 'type': analysis_type,
-                'usage': {
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
+                'model': model,
+                'usage': result['usage']
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def handle_analyze_all(self, data):
+        """Run several analysis types over one text concurrently."""
+        text = data.get('text', '')
+        analysis_types = data.get('analysis_types', list(_SYSTEM_MSGS))
+        temperature = data.get('temperature')
+        
+        # Filler is part of the text being analyzed, so only whitespace is compressed
+        if data.get('compress', True) and isinstance(text, str):
+            text = _compress(text, strip_filler=False)
+        rejected = _reject_input(text, 'text')
+        if rejected:
+            return rejected
+        if not isinstance(analysis_types, list) or not all(isinstance(t, str) for t in analysis_types):
+            return {'success': False, 'error': 'analysis_types must be a list of strings'}
+        if not analysis_types:
+            return {'success': False, 'error': 'empty analysis_types'}
+        unknown = [t for t in analysis_types if t not in _SYSTEM_MSGS]
+        if unknown:
+            return {'success': False, 'error': f'unknown analysis_type: {", ".join(unknown)}'}
+        analysis_types = list(dict.fromkeys(analysis_types))
+        
+        def run(analysis_type):
+            return _complete(
+                _pick_model(data.get('model'), text, analysis_type),
+                _analyze_messages(text, analysis_type),
+                max_tokens=_analysis_max_tokens(text),
+                temperature=temperature
+            )
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(min(len(analysis_types), len(_SYSTEM_MSGS)), 1)) as pool:
+                results = list(pool.map(run, analysis_types))
+            
+            return {
+                'success': True,
+                'analyses': {
+                    analysis_type: {
+                        'analysis': result['content'],
+                        'usage': result['usage']
+                    }
+                    for analysis_type, result in zip(analysis_types, results)
                 }
             }
         except Exception as e:
@@ -137,20 +655,173 @@ class handler(BaseHTTPRequestHandler):
                 'error': str(e)
             }
     
-    def handle_list_tools(self):
-        """Return available tools."""
-        return {
-            'success': True,
-            'tools': [
-                {
-                    'name': 'chat',
-                    'description': 'Chat with ChatGPT',
-                    'parameters': ['message', 'system_prompt (optional)', 'model (optional: gpt-4o, gpt-4o-mini, gpt-4-turbo)']
-                },
-                {
-                    'name': 'analyze',
-                    'description': 'Analyze text',
-                    'parameters': ['text', 'analysis_type (sentiment|themes|summary|key_points)']
+    def handle_analyze_batch(self, data):
+        """Handle several text analysis requests in a single completion."""
+        items = data.get('items', [])
+        temperature = data.get('temperature')
+        
+        rejected = _reject_analyze_items(items)
+        if rejected:
+            return rejected
+        # The items share one prompt, so the input limit applies to them together
+        if sum(len(item['text']) for item in items) > MAX_INPUT_CHARS:
+            return {'success': False, 'error': f'items exceed {MAX_INPUT_CHARS} characters in total'}
+        
+        system_prompt = (
+            "You analyze several numbered inputs at once. Each input names an analysis type:\n"
+            "- sentiment: analyze the sentiment and provide a detailed assessment\n"
+            "- themes: identify and explain the main themes\n"
+            "- summary: provide a concise summary\n"
+            "- key_points: extract the key points as a bulleted list\n"
+            'Return a JSON object {"results": [...]} where element i is the analysis for input i, as a string.'
+        )
+        
+        def parse(result):
+            if result['finish_reason'] == 'length':
+                raise ValueError('batch reply was truncated; send fewer or shorter items')
+            reply = json.loads(result['content'])
+            analyses = reply.get('results') if isinstance(reply, dict) else None
+            if (not isinstance(analyses, list) or len(analyses) != len(items)
+                    or not all(isinstance(a, str) for a in analyses)):
+                raise ValueError(f'malformed batch reply: expected {len(items)} string results')
+            return analyses
+        
+        try:
+            user_prompt = "\n\n".join(
+                f"Input {i} ({item.get('analysis_type', 'summary')}):\n{item['text']}"
+                for i, item in enumerate(items)
+            )
+            result = _complete(
+                "gpt-4o",
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=min(1000 * max(len(items), 1), 16384),
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                parse=parse
+            )
+            
+            return {
+                'success': True,
+                'results': [
+                    {
+                        'analysis': analysis,
+                        'type': item.get('analysis_type', 'summary')
+                    }
+                    for analysis, item in zip(result['parsed'], items)
+                ],
+                'usage': result['usage']
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def handle_chat_async(self, data):
+        """Submit chat requests to the Batch API and return the batch id."""
+        items = data.get('items', [])
+        
+        rejected = _reject_items(items, 'message')
+        if rejected:
+            return rejected
+        
+        try:
+            batch_id = _submit_batch([
+                (
+                    _pick_model(item.get('model'), item.get('message', '')),
+                    [
+                        {"role": "system", "content": item.get('system_prompt', 'You are a helpful AI assistant.')},
+                        {"role": "user", "content": item.get('message', '')}
+                    ]
+                )
+                for item in items
+            ])
+            
+            return {
+                'success': True,
+                'batch_id': batch_id
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def handle_analyze_async(self, data):
+        """Submit text analysis requests to the Batch API and return the batch id."""
+        items = data.get('items', [])
+        
+        rejected = _reject_analyze_items(items)
+        if rejected:
+            return rejected
+        
+        try:
+            batch_id = _submit_batch([
+                (
+                    _pick_model(item.get('model'), item.get('text', ''), item.get('analysis_type', 'summary')),
+                    _analyze_messages(item.get('text', ''), item.get('analysis_type', 'summary'))
+                )
+                for item in items
+            ])
+            
+            return {
+                'success': True,
+                'batch_id': batch_id
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def handle_batch_result(self, data):
+        """Poll a Batch API job and return its results once completed."""
+        batch_id = data.get('batch_id', '')
+        
+        try:
+            batch = _get_client().batches.retrieve(batch_id)
+            if batch.status != "completed":
+                return {
+                    'success': True,
+                    'batch_id': batch_id,
+                    'status': batch.status
                 }
-            ]
-        }
\ No newline at end of file
+            
+            # Successful requests land in the output file and failed ones in
+            # the error file; either may be missing
+            results = {}
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                for line in _get_client().files.content(file_id).text.splitlines():
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    index = int(entry['custom_id'].rsplit('-', 1)[1])
+                    body = (entry.get('response') or {}).get('body') or {}
+                    if entry.get('error') or 'choices' not in body:
+                        results[index] = {'error': entry.get('error') or body.get('error')}
+                    else:
+                        results[index] = {
+                            'response': body['choices'][0]['message']['content'],
+                            'usage': body.get('usage')
+                        }
+            
+            # Results are positional: element i answers input i, None if absent
+            total = batch.request_counts.total if batch.request_counts else 0
+            total = max(total, max(results, default=-1) + 1)
+            
+            return {
+                'success': True,
+                'batch_id': batch_id,
+                'status': batch.status,
+                'results': [results.get(i) for i in range(total)]
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
@@ -4,6 +4,9 @@ A Model Context Protocol server that connects to ChatGPT via OpenAI API
 """
 
 import asyncio
+from collections import OrderedDict
+import hashlib
+import json
 from typing import Any
 from mcp.server import Server
 from mcp.types import (
@@ -13,64 +16,173 @@ from mcp.types import (
     EmbeddedResource,
 )
 import mcp.server.stdio
-from openai import OpenAI
+import ssl
+import httpx
+from openai import AsyncOpenAI
 import os
+import re
 
 # Initialize the MCP server
 app = Server("chatgpt-mcp-server")
 
+# Build the SSL context once; creating it loads the CA bundle from disk
+_SSL_CTX = ssl.create_default_context()
+
+# Shared connection pool so repeated calls reuse keep-alive sockets
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+_HTTP = httpx.AsyncClient(verify=_SSL_CTX, limits=_LIMITS, timeout=httpx.Timeout(30.0, connect=10.0))
+
 # Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=_HTTP)
+
+# Fixed instructions go in a leading system message and the text in a trailing
+# user message. This only prepares for OpenAI prompt caching: these prefixes are
+# far below its 1024-token minimum, so nothing is cached by them today.
+_SYSTEM_MSGS = {
+    "sentiment": {"role": "system", "content": "Analyze the sentiment of the text the user sends and provide a detailed assessment."},
+    "themes": {"role": "system", "content": "Identify and explain the main themes in the text the user sends."},
+    "summary": {"role": "system", "content": "Provide a concise summary of the text the user sends."},
+    "key_points": {"role": "system", "content": "Extract the key points from the text the user sends as a bulleted list."}
+}
+
+# Inputs longer than this are rejected before they reach the API
+MAX_INPUT_CHARS = 200_000
+
+
+def _reject_input(value: Any, field: str) -> str | None:
+    """Return an error message for an empty or oversized input, or None if it is usable."""
+    if not isinstance(value, str) or not value.strip():
+        return f"Error: empty {field}"
+    if len(value) > MAX_INPUT_CHARS:
+        return f"Error: {field} exceeds {MAX_INPUT_CHARS} characters"
+    return None
+
+
+# Politeness filler that adds tokens without changing the request
+_FILLER = re.compile(r'\b(could you (please )?|please |kindly |I would like to |can you )', re.I)
+
+
+def _compress(s: str, strip_filler: bool = True) -> str:
+    """Collapse redundant whitespace in a prompt and, optionally, strip filler phrases."""
+    # Leading indentation is kept so pasted code, YAML and nested lists survive
+    s = re.sub(r'(?<=\S)[ \t]+(?=\S)', ' ', s)
+    if strip_filler:
+        s = _FILLER.sub('', s)
+    s = re.sub(r'[ \t]+$', '', s, flags=re.M)
+    s = re.sub(r'\n{3,}', '\n\n', s)
+    return s.rstrip().lstrip('\n')
+
+
+# Short inputs of these kinds are handled well by the smaller model
+_SHORT_INPUT_CHARS = 500
+_MINI_TYPES = {None, "summary", "sentiment"}
+
+
+def _pick_model(explicit: str | None, text: str, analysis_type: str | None = None) -> str:
+    """Return the caller's model, or gpt-4o-mini for short simple inputs and gpt-4o otherwise."""
+    if explicit:
+        return explicit
+    if len(text) < _SHORT_INPUT_CHARS and analysis_type in _MINI_TYPES:
+        return "gpt-4o-mini"
+    return "gpt-4o"
+
+
+def _analysis_max_tokens(text: str) -> int:
+    """Cap analysis output in proportion to the input length."""
+    return min(1000, max(256, len(text) // 2))
+
+
+# Exact-match LRU cache of completions, keyed by (model, messages, max_tokens)
+_CACHE = OrderedDict()
+_CACHE_MAX = 1024
+
+
+def _key(model: str, messages: list[dict], max_tokens: int) -> str:
+    """Build a stable cache key for a completion request."""
+    payload = json.dumps({"m": model, "msgs": messages, "mt": max_tokens}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _complete(model: str, messages: list[dict], max_tokens: int = 1000) -> str:
+    """Run a chat completion, serving repeated requests from the cache."""
+    k = _key(model, messages, max_tokens)
+    if k in _CACHE:
+        _CACHE.move_to_end(k)
+        return _CACHE[k]
+
+    response = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens
+    )
+    result = response.choices[0].message.content
+
+    _CACHE[k] = result
+    if len(_CACHE) > _CACHE_MAX:
+        _CACHE.popitem(last=False)
+    return result
+
+# Tool definitions are built once; MCP clients treat the list as read-only
+_TOOLS = [
+    Tool(
+        name="chat_with_gpt",
+        description="Send a message to ChatGPT and get a response. Use this for general conversations, questions, analysis, or any task requiring AI assistance.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "message": {
+                    "type": "string",
+                    "description": "The message or prompt to send to ChatGPT"
+                },
+                "system_prompt": {
+                    "type": "string",
+                    "description": "Optional system prompt to guide ChatGPT's behavior",
+                    "default": ""
+                },
+                "model": {
+                    "type": "string",
+                    "description": "GPT model to use (defaults to gpt-4o-mini for short messages, gpt-4o otherwise)",
+                    "enum": ["gpt-4o", "gpt-4o-mini", "gpt-4-turbo"]
+                },
+                "compress": {
+                    "type": "boolean",
+                    "description": "Strip filler phrases and redundant whitespace before sending",
+                    "default": True
+                }
+            },
+            "required": ["message"]
+        }
+    ),
+    Tool(
+        name="analyze_text",
+        description="Analyze text for sentiment, themes, or specific patterns using ChatGPT",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "The text to analyze"
+                },
+                "analysis_type": {
+                    "type": "string",
+                    "enum": ["sentiment", "themes", "summary", "key_points"],
+                    "description": "Type of analysis to perform"
+                },
+                "compress": {
+                    "type": "boolean",
+                    "description": "Collapse redundant whitespace before sending",
+                    "default": True
+                }
+            },
+            "required": ["text", "analysis_type"]
+        }
+    )
+]
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
-    return [
-        Tool(
-            name="chat_with_gpt",
-            description="Send a message to ChatGPT and get a response. Use this for general conversations, questions, analysis, or any task requiring AI assistance.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "message": {
-                        "type": "string",
-                        "description": "The message or prompt to send to ChatGPT"
-                    },
-                    "system_prompt": {
-                        "type": "string",
-                        "description": "Optional system prompt to guide ChatGPT's behavior",
-                        "default": ""
-                    },
-                    "model": {
-                        "type": "string",
-                        "description": "GPT model to use",
-                        "enum": ["gpt-4o", "gpt-4o-mini", "gpt-4-turbo"],
-                        "default": "gpt-4o"
-                    }
-                },
-                "required": ["message"]
-            }
-        ),
-        Tool(
-            name="analyze_text",
-            description="Analyze text for sentiment, themes, or specific patterns using ChatGPT",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "The text to analyze"
-                    },
-                    "analysis_type": {
-                        "type": "string",
-                        "enum": ["sentiment", "themes", "summary", "key_points"],
-                        "description": "Type of analysis to perform"
-                    }
-                },
-                "required": ["text", "analysis_type"]
-            }
-        )
-    ]
+    return _TOOLS
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
@@ -79,19 +191,22 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     if name == "chat_with_gpt":
         message = arguments.get("message")
         system_prompt = arguments.get("system_prompt", "You are a helpful AI assistant.")
-        model = arguments.get("model", "gpt-4o")
+        
+        if arguments.get("compress", True) and isinstance(message, str):
+            message = _compress(message)
+        rejected = _reject_input(message, "message")
+        if rejected:
+            return [TextContent(type="text", text=rejected)]
+        model = _pick_model(arguments.get("model"), message)
         
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
+            result = await _complete(
+                model,
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message}
-                ],
-                max_tokens=1000
+                ]
             )
-            
-            result = response.choices[0].message.content
             return [TextContent(type="text", text=result)]
             
         except Exception as e:
@@ -101,23 +216,22 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         text = arguments.get("text")
         analysis_type = arguments.get("analysis_type")
         
-        prompts = {
-            "sentiment": f"Analyze the sentiment of this text and provide a detailed assessment:\n\n{text}",
-            "themes": f"Identify and explain the main themes in this text:\n\n{text}",
-            "summary": f"Provide a concise summary of this text:\n\n{text}",
-            "key_points": f"Extract the key points from this text as a bulleted list:\n\n{text}"
-        }
+        # Filler is part of the text being analyzed, so only whitespace is compressed
+        if arguments.get("compress", True) and isinstance(text, str):
+            text = _compress(text, strip_filler=False)
+        rejected = _reject_input(text, "text")
+        if rejected:
+            return [TextContent(type="text", text=rejected)]
+        if not isinstance(analysis_type, str) or analysis_type not in _SYSTEM_MSGS:
+            return [TextContent(type="text", text=f"Error: unknown analysis_type: {analysis_type}")]
+        model = _pick_model(None, text, analysis_type)
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "user", "content": prompts[analysis_type]}
-                ],
-                max_tokens=1000
+            result = await _complete(
+                model,
+                [_SYSTEM_MSGS[analysis_type], {"role": "user", "content": text}],
+                max_tokens=_analysis_max_tokens(text)
             )
-            
-            result = response.choices[0].message.content
             return [TextContent(type="text", text=result)]
             
         except Exception as e:
@@ -126,14 +240,30 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     else:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
+async def _warm_connection():
+    """Open a keep-alive connection to the OpenAI API ahead of the first tool call."""
+    try:
+        await _HTTP.head(
+            "https://api.openai.com/v1/models",
+            headers={"Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY', '')}"}
+        )
+    except Exception:
+        pass
+
 async def main():
     """Run the MCP server using stdio transport."""
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+        # Hold a reference so the warm-up task is not garbage collected
+        warm_task = asyncio.create_task(_warm_connection())
+        try:
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+        finally:
+            # Close the pooled connections on the loop that opened them
+            await client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file